@@ -1,8 +1,12 @@
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import Font
 from string_normalizer import TextProcessor
+import hashlib
+import mmap
 import os
+import random
 import re
+import struct
 
 text_processor = TextProcessor()
 
@@ -31,6 +35,19 @@ def split_sentences(text):
     return [sentence.strip() for sentence in result if sentence.strip()]
 
 
+def reservoir_add(reservoir, seen, item, size, rng):
+    """
+    Add an item to a fixed-size reservoir (Algorithm R).
+    `seen` is the number of items offered before this one.
+    """
+    if len(reservoir) < size:
+        reservoir.append(item)
+    else:
+        j = rng.randrange(seen + 1)
+        if j < size:
+            reservoir[j] = item
+
+
 def categorize_sentence(sentence):
     """Categorize sentences based on word count."""
     word_count = len(sentence.split())
@@ -46,26 +63,190 @@ def categorize_sentence(sentence):
         return "Very Long (16+ words)"
 
 
-# Load data from english_news_articles.xlsx
-input_file = "english_news_articles.xlsx"
-wb_input = load_workbook(input_file)
-sheet = wb_input.active  # Read the first sheet
+SNAPSHOT_MAGIC = b"SNCSNAP2"
+# magic, source size, source mtime_ns, source sha256, payload sha256
+SNAPSHOT_HEADER = struct.Struct("<8sQQ32s32s")
+ROW_HEADER = struct.Struct("<II")  # domain length, text length
 
-headers = [str(cell.value).strip().lower() for cell in sheet[1]]
 
-if "domain" not in headers or "text" not in headers:
-    raise ValueError("Missing 'Domain' or 'text' columns in the Excel file.")
+def file_key(path):
+    """Return the (size, mtime_ns, sha256) key identifying a source file."""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return stat.st_size, stat.st_mtime_ns, digest.digest()
 
-category_idx = headers.index("domain")
-text_idx = headers.index("text")
 
-data = {}
-for row in sheet.iter_rows(min_row=2, values_only=True):
-    if row[category_idx] is None or row[text_idx] is None:
-        continue  # Skip empty rows
+def read_workbook_rows(path):
+    """Yield (domain, text) rows from the first sheet of an Excel workbook."""
+    wb_input = load_workbook(path, read_only=True)
+    try:
+        sheet = wb_input.active  # Read the first sheet
+        sheet.reset_dimensions()  # Don't trust a possibly stale <dimension> tag
+
+        rows = sheet.iter_rows(values_only=True)
+        headers = [str(value).strip().lower() for value in next(rows, ())]
+
+        if "domain" not in headers or "text" not in headers:
+            raise ValueError("Missing 'Domain' or 'text' columns in the Excel file.")
+
+        category_idx = headers.index("domain")
+        text_idx = headers.index("text")
+
+        min_length = max(category_idx, text_idx) + 1
+        for row in rows:
+            if len(row) < min_length:
+                continue  # Read-only sheets may yield rows without trailing empty cells
+            if row[category_idx] is None or row[text_idx] is None:
+                continue  # Skip empty rows
+            yield str(row[category_idx]).strip(), str(row[text_idx]).strip()
+    finally:
+        wb_input.close()
+
+
+def write_snapshot(snapshot_path, key, rows):
+    """
+    Pass rows through while writing them to a length-prefixed binary snapshot
+    tagged with the source key and a digest of the records. The snapshot is only
+    a cache, so write failures are reported and the remaining rows are still yielded.
+    """
+    tmp_path = snapshot_path + ".tmp"
+    payload_digest = hashlib.sha256()
+    try:
+        f = open(tmp_path, "wb")
+    except OSError as e:
+        print(f"Could not write snapshot {snapshot_path}: {e}")
+        f = None
+    if f is not None:
+        try:
+            # The payload digest is filled in once all records are written
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, *key, bytes(32)))
+        except OSError as e:
+            print(f"Could not write snapshot {snapshot_path}: {e}")
+            f.close()
+            f = None
+
+    try:
+        for domain, text in rows:
+            if f is not None:
+                domain_bytes = domain.encode("utf-8")
+                text_bytes = text.encode("utf-8")
+                record = (
+                    ROW_HEADER.pack(len(domain_bytes), len(text_bytes))
+                    + domain_bytes
+                    + text_bytes
+                )
+                payload_digest.update(record)
+                try:
+                    f.write(record)
+                except OSError as e:
+                    print(f"Could not write snapshot {snapshot_path}: {e}")
+                    f.close()
+                    f = None
+            yield domain, text
+
+        if f is not None:
+            try:
+                f.seek(0)
+                f.write(
+                    SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, *key, payload_digest.digest())
+                )
+                f.close()
+                f = None
+                os.replace(tmp_path, snapshot_path)
+            except OSError as e:
+                print(f"Could not write snapshot {snapshot_path}: {e}")
+    finally:
+        # Covers write failures and runs that stop before the workbook is fully read
+        if f is not None:
+            f.close()
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
 
-    category = str(row[category_idx]).strip()
-    normalized_text = normalize_text(str(row[text_idx]).strip())
+def snapshot_is_valid(snapshot_path, key):
+    """
+    Check that a snapshot exists, was built from the source file identified by key,
+    that its records exactly fill the file, and that they match the stored digest.
+    """
+    try:
+        if not os.path.isfile(snapshot_path) or os.path.getsize(snapshot_path) == 0:
+            return False
+
+        with open(snapshot_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if len(buf) < SNAPSHOT_HEADER.size:
+                    return False
+                magic, *stored_key, stored_digest = SNAPSHOT_HEADER.unpack_from(buf, 0)
+                if magic != SNAPSHOT_MAGIC or tuple(stored_key) != key:
+                    return False
+
+                offset = SNAPSHOT_HEADER.size
+                end = len(buf)
+                while offset < end:
+                    if offset + ROW_HEADER.size > end:
+                        return False
+                    domain_len, text_len = ROW_HEADER.unpack_from(buf, offset)
+                    offset += ROW_HEADER.size + domain_len + text_len
+                if offset != end:
+                    return False
+
+                payload_digest = hashlib.sha256()
+                for start in range(SNAPSHOT_HEADER.size, end, 1 << 20):
+                    payload_digest.update(buf[start : min(start + (1 << 20), end)])
+                return payload_digest.digest() == stored_digest
+    except OSError:
+        return False
+
+
+def read_snapshot(snapshot_path):
+    """Yield (domain, text) rows directly from a memory-mapped snapshot."""
+    with open(snapshot_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offset = SNAPSHOT_HEADER.size
+            end = len(buf)
+            while offset < end:
+                domain_len, text_len = ROW_HEADER.unpack_from(buf, offset)
+                offset += ROW_HEADER.size
+                domain = buf[offset : offset + domain_len].decode("utf-8")
+                offset += domain_len
+                text = buf[offset : offset + text_len].decode("utf-8")
+                offset += text_len
+                yield domain, text
+
+
+def load_rows(path):
+    """
+    Yield (domain, text) rows from an Excel workbook, using a cached binary snapshot
+    next to the workbook when it matches the workbook's size, mtime, and hash.
+    """
+    snapshot_path = path + ".snapshot"
+    key = file_key(path)
+    if snapshot_is_valid(snapshot_path, key):
+        yield from read_snapshot(snapshot_path)
+        return
+
+    yield from write_snapshot(snapshot_path, key, read_workbook_rows(path))
+
+
+# Load data from english_news_articles.xlsx
+input_file = "english_news_articles.xlsx"
+rows = load_rows(input_file)
+
+# Set to N to keep at most N randomly sampled sentences per (domain, length bucket)
+sample_size = None
+sample_seed = 42
+rng = random.Random(sample_seed)
+
+data = {}
+seen_counts = {}
+for category, text in rows:
+    normalized_text = normalize_text(text)
     sentences = split_sentences(normalized_text)
 
     if category not in data:
@@ -76,10 +257,21 @@ for row in sheet.iter_rows(min_row=2, values_only=True):
             "Long (12-15 words)": [],
             "Very Long (16+ words)": [],
         }
+        seen_counts[category] = dict.fromkeys(data[category], 0)
 
     for sentence in sentences:
         sentence_category = categorize_sentence(sentence)
-        data[category][sentence_category].append(sentence)
+        if sample_size is None:
+            data[category][sentence_category].append(sentence)
+        else:
+            reservoir_add(
+                data[category][sentence_category],
+                seen_counts[category][sentence_category],
+                sentence,
+                sample_size,
+                rng,
+            )
+        seen_counts[category][sentence_category] += 1
 
 # Load or create output Excel file
 output_file = "Categorized_Sentences.xlsx"